@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub API client setup for the review scripts.
+
+Centralizes token resolution and connection reuse: one lazily-created
+httpx.Client serves all synchronous calls in a process, so back-to-back
+requests share the same TLS session, and make_async_client() builds
+AsyncClients with the identical configuration. HTTP/2 is enabled when
+the h2 package is installed, allowing concurrent requests to multiplex
+over a single connection.
+"""
+
+import os
+import sys
+import json
+import atexit
+import subprocess
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+API_ROOT = 'https://api.github.com'
+
+_token = None
+_client = None
+
+
+def get_token():
+    """
+    Return a GitHub API token, preferring GITHUB_TOKEN/GH_TOKEN from the
+    environment over a one-time cached `gh auth token` call.
+    """
+    global _token
+    if _token is None:
+        _token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN')
+        if not _token:
+            try:
+                result = subprocess.run(
+                    ['gh', 'auth', 'token'],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            except subprocess.CalledProcessError as e:
+                print(f"Error getting auth token: {e.stderr}", file=sys.stderr)
+                sys.exit(1)
+            _token = result.stdout.strip()
+    return _token
+
+
+def print_json(obj):
+    """Pretty-print JSON to stdout, via orjson's C encoder when available."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(obj, indent=2))
+
+
+def api_headers():
+    """Build the standard GitHub API request headers."""
+    return {
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': '2022-11-28',
+        'Authorization': f'Bearer {get_token()}',
+    }
+
+
+def infer_repo():
+    """Resolve owner/repo for the current directory using gh (one call)."""
+    try:
+        result = subprocess.run(
+            ['gh', 'repo', 'view', '--json', 'nameWithOwner', '--jq', '.nameWithOwner'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error inferring repository: {e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    return result.stdout.strip()
+
+
+def _client_kwargs():
+    """Common configuration for both sync and async clients."""
+    return {
+        'base_url': API_ROOT,
+        'headers': api_headers(),
+        'timeout': httpx.Timeout(30, connect=10),
+        'limits': httpx.Limits(max_keepalive_connections=10),
+        'follow_redirects': True,
+    }
+
+
+def get_client():
+    """Return the process-wide httpx.Client, creating it on first use."""
+    global _client
+    if _client is None:
+        kwargs = _client_kwargs()
+        try:
+            _client = httpx.Client(http2=True, **kwargs)
+        except ImportError:  # h2 not installed; HTTP/1.1 still reuses connections
+            _client = httpx.Client(**kwargs)
+        atexit.register(_client.close)
+    return _client
+
+
+def make_async_client():
+    """Build an httpx.AsyncClient configured like the shared sync client."""
+    kwargs = _client_kwargs()
+    try:
+        return httpx.AsyncClient(http2=True, **kwargs)
+    except ImportError:  # h2 not installed; HTTP/1.1 still reuses connections
+        return httpx.AsyncClient(**kwargs)
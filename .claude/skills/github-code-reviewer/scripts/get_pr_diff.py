@@ -4,61 +4,185 @@ Get the full diff for a pull request.
 Usage: python get_pr_diff.py <pr_url_or_number> [--file <filepath>]
 """
 
+import io
+import os
+import re
 import sys
 import subprocess
-import argparse
 
+try:
+    import httpx
+    import api_client
+except ImportError:  # httpx missing; degrade to the gh CLI
+    httpx = None
 
-def get_pr_diff(pr_identifier, repo=None, filepath=None):
+# Matches the start of each per-file section in a unified diff; splitting on
+# it happens in one C-level pass instead of a Python loop over every line.
+_FILE_BOUNDARY = re.compile(r'(?m)^(?=diff --git )')
+
+# Extracts owner, repo, and number from a PR URL in one C-level pass
+_PR_URL = re.compile(r'github\.com/([^/]+)/([^/]+)/pull/(\d+)')
+
+
+def get_pr_diff(pr_identifier, repo=None, filepath=None, out=None):
     """
-    Fetch PR diff using gh CLI.
+    Stream a PR diff from the GitHub API without buffering it in memory.
+
+    Requests the raw unified diff directly via the diff media type, so no
+    gh process is spawned and no JSON is decoded along the way.
 
     Args:
         pr_identifier: Either PR number or full PR URL
         repo: Optional repository in format owner/repo
         filepath: Optional specific file to get diff for
-
-    Returns:
-        str: The diff content
+        out: File object to write the diff to (defaults to stdout)
     """
+    if out is None:
+        out = sys.stdout
+
     # Extract PR number and repo from identifier if it's a URL
     if pr_identifier.startswith('http'):
-        parts = pr_identifier.rstrip('/').split('/')
-        pr_number = parts[-1]
+        match = _PR_URL.search(pr_identifier)
+        if not match:
+            print(f"Error: Unrecognized PR URL: {pr_identifier}", file=sys.stderr)
+            sys.exit(1)
+        owner, repo_name, pr_number = match.groups()
         if not repo:
-            repo = f"{parts[-4]}/{parts[-3]}"
+            repo = f"{owner}/{repo_name}"
     else:
         pr_number = pr_identifier
 
-    # Build gh command
-    cmd = ['gh', 'pr', 'diff', pr_number]
-    if repo:
-        cmd.extend(['--repo', repo])
+    if httpx is None:
+        # gh resolves the repo itself when none was given
+        _gh_fallback(pr_number, repo, filepath, out)
+        return
+
+    if not repo:
+        repo = api_client.infer_repo()
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        with api_client.get_client().stream(
+            'GET', f"/repos/{repo}/pulls/{pr_number}",
+            headers={'Accept': 'application/vnd.github.v3.diff'},
+        ) as response:
+            response.raise_for_status()
+            if filepath:
+                # Stops downloading once the target file's block has passed
+                _write_filtered(response.iter_text(65536), filepath, out)
+            else:
+                for chunk in response.iter_text(65536):
+                    out.write(chunk)
+    except httpx.HTTPError as e:
+        print(f"Error fetching PR diff: {e}", file=sys.stderr)
+        sys.exit(1)
 
-        diff = result.stdout
 
-        # If specific file requested, filter the diff
-        if filepath:
-            diff = filter_diff_by_file(diff, filepath)
+def _gh_fallback(pr_number, repo, filepath, out):
+    """
+    Serve the diff via the gh CLI when httpx is unavailable.
 
-        return diff
+    With no filter, the Python process image is replaced outright with gh
+    via os.execvp — no pipe copy and no interpreter teardown. A filtered
+    diff must pass through the block splitter, so gh runs as a child and
+    is terminated once the target file's block has been written.
+    """
+    argv = ['gh', 'pr', 'diff', pr_number]
+    if repo:
+        argv.extend(['--repo', repo])
+
+    if filepath is None and out is sys.stdout:
+        os.execvp('gh', argv)  # never returns
+
+    process = subprocess.Popen(argv, stdout=subprocess.PIPE, text=True)
+    terminated = False
+    if filepath:
+        # Fixed-size reads, not line iteration: the splitter's cost is
+        # per chunk, so feed it 64 KB at a time
+        _write_filtered(
+            iter(lambda: process.stdout.read(65536), ''),
+            filepath,
+            out
+        )
+        if process.poll() is None:
+            process.terminate()
+            terminated = True
+    else:
+        for chunk in process.stdout:
+            out.write(chunk)
+    process.stdout.close()
+    returncode = process.wait()
 
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching PR diff: {e.stderr}", file=sys.stderr)
+    # gh writes its own message to stderr; an empty diff must not pass as
+    # success unless we cut gh off ourselves
+    if returncode != 0 and not terminated:
+        print(f"Error fetching PR diff: gh exited with status {returncode}", file=sys.stderr)
         sys.exit(1)
 
 
+def _write_filtered(chunks, filepath, out):
+    """
+    Write only the blocks belonging to the target file, returning as soon
+    as its section has passed so the producer can be stopped early.
+    """
+    seen_target = False
+    for block in _iter_file_blocks(chunks):
+        if filepath in block.split('\n', 1)[0]:
+            out.write(block)
+            seen_target = True
+        elif seen_target:
+            break
+
+
+def _iter_file_blocks(chunks):
+    """
+    Yield per-file diff blocks from an iterable of text chunks.
+
+    Only the newly appended data is scanned for file boundaries (with a
+    small overlap in case one straddles a chunk seam), so cost stays
+    linear even when a single file's block spans many chunks. The final
+    (possibly incomplete) block is held back until more data arrives or
+    the input ends.
+    """
+    marker = '\ndiff --git '
+    buffer = ''
+    for chunk in chunks:
+        scan_from = max(0, len(buffer) - len(marker))
+        buffer += chunk
+        while True:
+            idx = buffer.find(marker, scan_from)
+            if idx == -1:
+                break
+            # Keep the newline with the finished block, as re.split did
+            block, buffer = buffer[:idx + 1], buffer[idx + 1:]
+            scan_from = 0
+            if block:
+                yield block
+    if buffer:
+        yield buffer
+
+
+def split_diff_by_file(diff):
+    """
+    Split unified diff content into per-file chunks in one pass.
+
+    Args:
+        diff: The full diff content
+
+    Returns:
+        dict: Mapping of file path (the 'b/' side) to its diff chunk
+    """
+    chunks = {}
+    for block in _FILE_BOUNDARY.split(diff):
+        if not block:
+            continue
+        header = block.split('\n', 1)[0]
+        chunks[header.rsplit(' b/', 1)[-1]] = block
+    return chunks
+
+
 def filter_diff_by_file(diff, filepath):
     """
-    Filter unified diff to only show changes for a specific file.
+    Filter unified diff content to only show changes for a specific file.
 
     Args:
         diff: The full diff content
@@ -67,22 +191,51 @@ def filter_diff_by_file(diff, filepath):
     Returns:
         str: Filtered diff content
     """
-    lines = diff.split('\n')
-    result = []
-    in_target_file = False
+    # Only the 'diff --git' header line needs scanning for the path
+    return ''.join(
+        block for block in _FILE_BOUNDARY.split(diff)
+        if block and filepath in block.split('\n', 1)[0]
+    )
 
-    for line in lines:
-        if line.startswith('diff --git'):
-            # Check if this is the file we want
-            in_target_file = filepath in line
 
-        if in_target_file:
-            result.append(line)
+def _run(pr_identifier, repo, filepath):
+    """Route one diff request through the agent when available."""
+    # A bare PR number is relative to this process's working directory,
+    # so resolve the repo here rather than in the agent's. Without httpx
+    # there is no api_client either; skip the agent and let the gh
+    # fallback infer the repo locally.
+    if repo is None and not pr_identifier.startswith('http'):
+        if httpx is None:
+            get_pr_diff(pr_identifier, repo, filepath)
+            return
+        repo = api_client.infer_repo()
+
+    try:
+        import gh_agent
+        sys.stdout.write(gh_agent.call('pr_diff', {
+            'pr_identifier': pr_identifier,
+            'repo': repo,
+            'file': filepath,
+        }))
+        return
+    except (ImportError, OSError):
+        pass
+    except gh_agent.AgentError as e:
+        print(f"Error fetching PR diff: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    return '\n'.join(result)
+    get_pr_diff(pr_identifier, repo, filepath)
 
 
 def main():
+    # Fast path: the common single-argument invocation needs none of the
+    # argparse machinery (or even its import)
+    if len(sys.argv) == 2 and not sys.argv[1].startswith('-'):
+        _run(sys.argv[1], None, None)
+        return
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Get the full diff for a pull request'
     )
@@ -98,11 +251,26 @@ def main():
         '--file',
         help='Specific file to get diff for (optional)'
     )
+    parser.add_argument(
+        '--files',
+        help='Comma-separated list of files to get diffs for (optional); '
+             'the diff is fetched once and split per file'
+    )
 
     args = parser.parse_args()
 
-    diff = get_pr_diff(args.pr_identifier, args.repo, args.file)
-    print(diff)
+    if args.files:
+        # One fetch, one split, then O(1) lookups per requested file
+        buffer = io.StringIO()
+        get_pr_diff(args.pr_identifier, args.repo, out=buffer)
+        chunks = split_diff_by_file(buffer.getvalue())
+        for path in args.files.split(','):
+            chunk = chunks.get(path.strip())
+            if chunk:
+                sys.stdout.write(chunk)
+        return
+
+    _run(args.pr_identifier, args.repo, args.file)
 
 
 if __name__ == '__main__':
@@ -4,17 +4,209 @@ Get comprehensive PR information including metadata, files changed, and reviews.
 Usage: python get_pr_info.py <pr_url_or_number>
 """
 
+import os
+import re
 import sys
 import json
-import subprocess
+import asyncio
 
+import httpx
 
-def get_pr_info(pr_identifier):
+import api_client
+
+# Extracts owner, repo, and number from a PR URL in one C-level pass
+_PR_URL = re.compile(r'github\.com/([^/]+)/([^/]+)/pull/(\d+)')
+
+_CACHE_PATH = os.path.expanduser('~/.cache/gh-reviewer/etags.json')
+_CACHE_MAX_ENTRIES = 32
+
+
+def _cache_load():
+    """Load the on-disk ETag cache, tolerating a missing or corrupt file."""
+    try:
+        with open(_CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cache_store(cache, key, etag, pr_info):
     """
-    Fetch PR information using gh CLI.
+    Persist one cache entry, evicting the oldest entries beyond the size
+    bound; failures here are never fatal.
+    """
+    cache.pop(key, None)
+    cache[key] = [etag, pr_info]
+    while len(cache) > _CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        with open(_CACHE_PATH, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+def _check_etag(path, etag):
+    """
+    Probe a REST path with If-None-Match, reading only the headers.
+
+    Returns (not_modified, new_etag). A 304 means the cached body is still
+    current; 304s are tiny and don't count against the rate limit. The
+    response body is never downloaded — the stream is closed after the
+    headers — and the probe is advisory: on any error the caller just
+    fetches normally.
+    """
+    headers = {'If-None-Match': etag} if etag else {}
+    try:
+        with api_client.get_client().stream('GET', path, headers=headers) as response:
+            status = response.status_code
+            response_headers = response.headers
+    except httpx.HTTPError:
+        return False, None
+
+    remaining = response_headers.get('X-RateLimit-Remaining')
+    if remaining is not None and int(remaining) < 100:
+        print(
+            f"Warning: only {remaining} GitHub API requests remaining",
+            file=sys.stderr
+        )
+
+    if status == 304:
+        return True, etag
+    return False, response_headers.get('ETag')
+
+
+# One query bundles metadata, files, and reviews into a single round trip
+_PR_QUERY = """\
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      number title body state
+      author { login }
+      headRefName headRefOid baseRefName
+      additions deletions url
+      files(first: 100) {
+        nodes { path additions deletions }
+        pageInfo { hasNextPage endCursor }
+      }
+      reviews(first: 100) {
+        nodes { author { login } state body submittedAt }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}
+"""
+
+# Follow-up cursor queries, only issued when the first page overflows
+_FILES_QUERY = """\
+query($owner: String!, $name: String!, $number: Int!, $cursor: String!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: 100, after: $cursor) {
+        nodes { path additions deletions }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}
+"""
+
+_REVIEWS_QUERY = """\
+query($owner: String!, $name: String!, $number: Int!, $cursor: String!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      reviews(first: 100, after: $cursor) {
+        nodes { author { login } state body submittedAt }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}
+"""
+
+
+async def _gql(client, query, variables):
+    """POST one GraphQL query and return the data payload."""
+    response = await client.post(
+        '/graphql',
+        json={'query': query, 'variables': variables}
+    )
+    response.raise_for_status()
+    body = response.json()
+    if body.get('errors'):
+        messages = '; '.join(e.get('message', '') for e in body['errors'])
+        print(f"Error fetching PR info: {messages}", file=sys.stderr)
+        sys.exit(1)
+    return body['data']
+
+
+async def _drain(client, query, variables, connection, page_info):
+    """Collect the remaining nodes of a paginated connection, if any."""
+    nodes = []
+    while page_info['hasNextPage']:
+        data = await _gql(
+            client,
+            query,
+            {**variables, 'cursor': page_info['endCursor']}
+        )
+        conn = data['repository']['pullRequest'][connection]
+        nodes.extend(conn['nodes'])
+        page_info = conn['pageInfo']
+    return nodes
+
+
+async def _fetch_pr(owner, name, number):
+    """Fetch PR metadata, files, and reviews in one GraphQL round trip."""
+    variables = {'owner': owner, 'name': name, 'number': number}
+    async with api_client.make_async_client() as client:
+        data = await _gql(client, _PR_QUERY, variables)
+        pr = data['repository']['pullRequest']
+        if pr is None:
+            print(f"Error: PR #{number} not found in {owner}/{name}", file=sys.stderr)
+            sys.exit(1)
+
+        # Only PRs with >100 files or reviews need extra pages
+        more_files, more_reviews = await asyncio.gather(
+            _drain(client, _FILES_QUERY, variables, 'files', pr['files']['pageInfo']),
+            _drain(client, _REVIEWS_QUERY, variables, 'reviews', pr['reviews']['pageInfo']),
+        )
+        pr['files']['nodes'].extend(more_files)
+        pr['reviews']['nodes'].extend(more_reviews)
+        return pr
+
+
+def _format_pr_info(pr):
+    """
+    Convert the GraphQL payload into the shape `gh pr view --json`
+    produced, so downstream consumers keep working unchanged.
+    """
+    return {
+        'number': pr['number'],
+        'title': pr['title'],
+        'body': pr['body'],
+        'state': pr['state'],
+        'author': pr['author'],
+        'headRefName': pr['headRefName'],
+        'headRefOid': pr['headRefOid'],
+        'baseRefName': pr['baseRefName'],
+        'files': pr['files']['nodes'],
+        'reviews': pr['reviews']['nodes'],
+        'url': pr['url'],
+        'additions': pr['additions'],
+        'deletions': pr['deletions'],
+    }
+
+
+def get_pr_info(pr_identifier, repo=None):
+    """
+    Fetch PR information via the GitHub GraphQL API, revalidating a local
+    ETag cache with a REST probe first so unchanged PRs are served from disk.
 
     Args:
         pr_identifier: Either PR number or full PR URL
+        repo: Optional repository in format owner/repo
 
     Returns:
         dict: PR information including title, body, files, reviews
@@ -22,36 +214,39 @@ def get_pr_info(pr_identifier):
     # Extract PR number and repo from identifier
     if pr_identifier.startswith('http'):
         # Parse URL like https://github.com/owner/repo/pull/123
-        parts = pr_identifier.rstrip('/').split('/')
-        pr_number = parts[-1]
-        repo = f"{parts[-4]}/{parts[-3]}"
+        match = _PR_URL.search(pr_identifier)
+        if not match:
+            print(f"Error: Unrecognized PR URL: {pr_identifier}", file=sys.stderr)
+            sys.exit(1)
+        owner, repo_name, pr_number = match.groups()
     else:
-        # Just a PR number, try to infer repo from current directory
+        # Just a PR number, infer repo from current directory
         pr_number = pr_identifier
-        repo = None
-
-    # Build gh command
-    cmd = ['gh', 'pr', 'view', pr_number]
-    if repo:
-        cmd.extend(['--repo', repo])
+        if not pr_number.isdigit():
+            print(f"Error: Invalid PR identifier: {pr_identifier}", file=sys.stderr)
+            sys.exit(1)
+        owner, _, repo_name = (repo or api_client.infer_repo()).partition('/')
 
-    cmd.extend([
-        '--json',
-        'number,title,body,state,author,headRefName,headRefOid,baseRefName,files,reviews,url,additions,deletions'
-    ])
+    # GraphQL has no ETag support, so validate against the REST endpoint:
+    # a 304 there means the PR is unchanged and the cached result is good
+    cache = _cache_load()
+    cache_key = f"/repos/{owner}/{repo_name}/pulls/{pr_number}"
+    entry = cache.get(cache_key)
+    not_modified, etag = _check_etag(cache_key, entry[0] if entry else None)
+    if not_modified:
+        return entry[1]
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching PR info: {e.stderr}", file=sys.stderr)
+        pr = asyncio.run(_fetch_pr(owner, repo_name, int(pr_number)))
+    except httpx.HTTPError as e:
+        print(f"Error fetching PR info: {e}", file=sys.stderr)
         sys.exit(1)
 
+    pr_info = _format_pr_info(pr)
+    if etag:
+        _cache_store(cache, cache_key, etag, pr_info)
+    return pr_info
+
 
 def main():
     if len(sys.argv) < 2:
@@ -59,10 +254,28 @@ def main():
         sys.exit(1)
 
     pr_identifier = sys.argv[1]
-    pr_info = get_pr_info(pr_identifier)
+
+    # A bare PR number is relative to this process's working directory,
+    # so resolve the repo here rather than in the agent's
+    repo = None
+    if not pr_identifier.startswith('http'):
+        repo = api_client.infer_repo()
+
+    # Use the persistent agent when one is running, otherwise work in-process
+    try:
+        import gh_agent
+        pr_info = gh_agent.call('pr_info', {
+            'pr_identifier': pr_identifier,
+            'repo': repo,
+        })
+    except (ImportError, OSError):
+        pr_info = get_pr_info(pr_identifier, repo)
+    except gh_agent.AgentError as e:
+        print(f"Error fetching PR info: {e}", file=sys.stderr)
+        sys.exit(1)
 
     # Pretty print the JSON
-    print(json.dumps(pr_info, indent=2))
+    api_client.print_json(pr_info)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Persistent agent that keeps a GitHub token and warm HTTP state in one
+long-lived process, so repeated script invocations skip auth setup.
+Usage: python gh_agent.py [--foreground]
+
+The sibling scripts send one JSON request per connection over a Unix
+socket and fall back to doing the work in-process when no agent is
+running, so starting the agent is always optional.
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import socketserver
+import contextlib
+import argparse
+
+
+class AgentError(RuntimeError):
+    """Raised when the agent handled a request but reports a failure."""
+
+
+def socket_path():
+    """Return the per-user path of the agent socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'gh-agent.sock')
+    return f"/tmp/gh-agent-{os.getuid()}.sock"
+
+
+def call(method, args=None, timeout=60):
+    """
+    Send one request to the running agent and return its result.
+
+    Args:
+        method: One of 'token', 'pr_info', 'pr_diff', 'submit_review'
+        args: dict of method arguments
+        timeout: Socket timeout in seconds
+
+    Raises OSError if no agent is reachable, AgentError if the agent
+    reports a failure for the request.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path())
+        request = {'method': method, 'args': args or {}}
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    response = json.loads(b''.join(chunks))
+    if not response.get('ok'):
+        raise AgentError(response.get('error', 'unknown agent error'))
+    return response.get('result')
+
+
+def _dispatch(method, args):
+    """Execute one request in-process and return its result."""
+    # Imported lazily so the client-side call() stays import-light
+    import api_client
+    import get_pr_info
+    import get_pr_diff
+    import submit_review
+
+    if method == 'token':
+        return api_client.get_token()
+    if method == 'pr_info':
+        return get_pr_info.get_pr_info(args['pr_identifier'], args.get('repo'))
+    if method == 'pr_diff':
+        out = io.StringIO()
+        get_pr_diff.get_pr_diff(
+            args['pr_identifier'],
+            args.get('repo'),
+            args.get('file'),
+            out=out
+        )
+        return out.getvalue()
+    if method == 'submit_review':
+        return submit_review.submit_review(
+            args['pr_number'],
+            args['repo'],
+            args['comments'],
+            args.get('event', 'COMMENT'),
+            args.get('body'),
+            args.get('commit_sha')
+        )
+    raise AgentError(f"unknown method: {method}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        # The worker code reports errors by printing to stderr and exiting,
+        # which a daemonized agent would send to /dev/null; capture it so
+        # the client sees the actual message
+        captured = io.StringIO()
+        try:
+            request = json.loads(line)
+            with contextlib.redirect_stderr(captured):
+                result = _dispatch(request.get('method'), request.get('args') or {})
+            response = {'ok': True, 'result': result}
+        except SystemExit as e:
+            error = captured.getvalue().strip()
+            response = {
+                'ok': False,
+                'error': error or f"agent worker exited with status {e.code}",
+            }
+        except Exception as e:
+            error = captured.getvalue().strip()
+            response = {'ok': False, 'error': f"{e}\n{error}".strip() if error else str(e)}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def serve():
+    """Run the agent server until killed."""
+    path = socket_path()
+    if os.path.exists(path):
+        os.unlink(path)
+    # Requests are handled one at a time: redirect_stderr swaps a
+    # process-global stream, so concurrent handlers would capture each
+    # other's output. The scripts issue one short request per invocation,
+    # so serializing costs nothing in practice.
+    with socketserver.UnixStreamServer(path, _Handler) as server:
+        server.serve_forever()
+
+
+def _daemonize():
+    """Detach from the controlling terminal (double fork)."""
+    if os.fork() > 0:
+        sys.exit(0)
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+
+def _agent_running():
+    """Check whether a live agent already owns the socket."""
+    try:
+        call('token', timeout=10)
+        return True
+    except (OSError, AgentError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Persistent GitHub API agent for the review scripts'
+    )
+    parser.add_argument(
+        '--foreground',
+        action='store_true',
+        help='Run in the foreground instead of daemonizing'
+    )
+    args = parser.parse_args()
+
+    if _agent_running():
+        print(f"Agent already running on {socket_path()}", file=sys.stderr)
+        return
+
+    if not args.foreground:
+        _daemonize()
+    serve()
+
+
+if __name__ == '__main__':
+    main()
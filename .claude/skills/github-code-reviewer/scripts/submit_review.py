@@ -6,41 +6,52 @@ Usage: python submit_review.py <pr_number> --repo owner/repo --comments-file com
 
 import sys
 import json
-import subprocess
+import mmap
+import time
+import random
+import asyncio
+import functools
 import argparse
 
+import httpx
 
-def submit_review(pr_number, repo, comments, event='COMMENT', body=None, commit_sha=None):
-    """
-    Submit a pull request review with multiple inline comments.
+import api_client
+from api_client import orjson
 
-    Args:
-        pr_number: PR number
-        repo: Repository in format owner/repo
-        comments: List of comment objects with {path, line, body, start_line (optional)}
-        event: Review event type (APPROVE, REQUEST_CHANGES, COMMENT)
-        body: Optional overall review summary
-        commit_sha: Optional commit SHA (defaults to PR head)
 
-    Returns:
-        dict: Response from GitHub API
+@functools.lru_cache(maxsize=128)
+def _head_sha(repo, pr_number):
     """
-    # Get commit SHA if not provided
-    if not commit_sha:
-        cmd = ['gh', 'pr', 'view', pr_number, '--repo', repo, '--json', 'headRefOid', '--jq', '.headRefOid']
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            commit_sha = result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"Error fetching commit SHA: {e.stderr}", file=sys.stderr)
-            sys.exit(1)
+    Look up the head commit SHA for a PR, cached per (repo, pr_number) so
+    repeated submissions against the same PR skip the round trip.
+
+    GITHUB_SHA is deliberately not consulted: on pull_request workflows
+    it names the ephemeral merge commit, which is not a valid commit_id
+    for review comments.
+    """
+    try:
+        response = api_client.get_client().get(f"/repos/{repo}/pulls/{pr_number}")
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Error fetching commit SHA: {e}", file=sys.stderr)
+        sys.exit(1)
+    return response.json()['head']['sha']
 
-    # Build API request
-    api_path = f"repos/{repo}/pulls/{pr_number}/reviews"
 
-    # Prepare review comments in GitHub API format
+def _build_payload(comments, event, body, commit_sha):
+    """
+    Build the review-creation payload in GitHub API format, dropping
+    exact duplicate comments so they aren't sent twice.
+    """
+    seen = set()
     formatted_comments = []
     for comment in comments:
+        start_line = comment.get('start_line')
+        key = (comment['path'], start_line, comment['line'], comment['body'])
+        if key in seen:
+            continue
+        seen.add(key)
+
         formatted_comment = {
             'path': comment['path'],
             'line': comment['line'],
@@ -49,13 +60,12 @@ def submit_review(pr_number, repo, comments, event='COMMENT', body=None, commit_
         }
 
         # Add start_line for multi-line comments
-        if 'start_line' in comment and comment['start_line'] is not None:
-            formatted_comment['start_line'] = comment['start_line']
+        if start_line is not None:
+            formatted_comment['start_line'] = start_line
             formatted_comment['start_side'] = 'RIGHT'
 
         formatted_comments.append(formatted_comment)
 
-    # Build request payload
     payload = {
         'commit_id': commit_sha,
         'event': event,
@@ -65,31 +75,191 @@ def submit_review(pr_number, repo, comments, event='COMMENT', body=None, commit_
     if body:
         payload['body'] = body
 
-    # Write payload to temp file for gh api
-    payload_json = json.dumps(payload)
+    return payload
 
-    # Execute API call
-    cmd = [
-        'gh', 'api',
-        '--method', 'POST',
-        '-H', 'Accept: application/vnd.github+json',
-        '-H', 'X-GitHub-Api-Version: 2022-11-28',
-        api_path,
-        '--input', '-'
-    ]
 
+def _load_json_file(path):
+    """
+    Load a JSON file, memory-mapping it for orjson's decoder when
+    available; falls back to stdlib json otherwise.
+
+    Raises FileNotFoundError for a missing file and ValueError (which
+    both decoders' errors subclass) for invalid JSON.
+    """
+    with open(path, 'rb') as f:
+        if orjson is not None:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return orjson.loads(memoryview(mm))
+            finally:
+                mm.close()
+        return json.load(f)
+
+
+def _json_request_kwargs(payload):
+    """
+    Build httpx request kwargs for a JSON payload, encoding it once with
+    orjson when available instead of letting httpx re-serialize it.
+    """
+    if orjson is not None:
+        return {
+            'content': orjson.dumps(payload),
+            'headers': {'Content-Type': 'application/json'},
+        }
+    return {'json': payload}
+
+
+def _post_with_retry(client, url, payload, max_tries=5):
+    """
+    POST with exponential backoff on transient failures (5xx and 429).
+
+    Honors Retry-After when the server provides it, otherwise backs off
+    1s, 2s, 4s, ... capped at 16s, with jitter so concurrent callers
+    don't retry in lockstep. Returns the final response; non-transient
+    errors are left for the caller's raise_for_status().
+    """
+    request_kwargs = _json_request_kwargs(payload)
+    response = None
+    for attempt in range(max_tries):
+        response = client.post(url, **request_kwargs)
+
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if remaining is not None and int(remaining) < 100:
+            print(
+                f"Warning: only {remaining} GitHub API requests remaining",
+                file=sys.stderr
+            )
+
+        if response.status_code < 500 and response.status_code != 429:
+            return response
+        if attempt == max_tries - 1:
+            break
+
+        if 'Retry-After' in response.headers:
+            delay = int(response.headers['Retry-After'])
+        else:
+            delay = min(2 ** attempt, 16) + random.random()
+        time.sleep(delay)
+
+    return response
+
+
+async def _respect_rate_limit(response):
+    """
+    Pause before issuing further requests when GitHub signals pressure,
+    honoring Retry-After and the primary rate-limit headers.
+    """
+    if 'Retry-After' in response.headers:
+        await asyncio.sleep(int(response.headers['Retry-After']))
+        return
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    reset = response.headers.get('X-RateLimit-Reset')
+    if remaining is not None and reset is not None and int(remaining) < 100:
+        await asyncio.sleep(max(0, int(reset) - time.time()))
+
+
+async def _asubmit_review(client, semaphore, job):
+    """
+    Submit one review over a shared AsyncClient, bounded by the semaphore.
+
+    Args:
+        client: httpx.AsyncClient configured with API headers
+        semaphore: asyncio.Semaphore capping in-flight requests
+        job: dict with pr_number, repo, comments, and optional event,
+            body, commit_sha
+
+    Returns:
+        dict: Response from GitHub API
+    """
+    repo = job['repo']
+    pr_number = job['pr_number']
+
+    # No GITHUB_SHA shortcut here: one env var can't be the head of N
+    # different PRs, so only an explicit per-job SHA skips the lookup
+    commit_sha = job.get('commit_sha')
+    if not commit_sha:
+        async with semaphore:
+            response = await client.get(f"/repos/{repo}/pulls/{pr_number}")
+            response.raise_for_status()
+            commit_sha = response.json()['head']['sha']
+
+    payload = _build_payload(
+        job['comments'],
+        job.get('event', 'COMMENT'),
+        job.get('body'),
+        commit_sha
+    )
+
+    async with semaphore:
+        response = await client.post(
+            f"/repos/{repo}/pulls/{pr_number}/reviews",
+            **_json_request_kwargs(payload)
+        )
+        # Hold the semaphore slot while backing off so the whole batch slows
+        await _respect_rate_limit(response)
+        response.raise_for_status()
+        return response.json()
+
+
+def submit_reviews_batch(jobs, max_concurrency=10):
+    """
+    Submit reviews to multiple PRs concurrently.
+
+    Args:
+        jobs: List of dicts with pr_number, repo, comments, and optional
+            event, body, commit_sha
+        max_concurrency: Cap on in-flight API requests
+
+    Returns:
+        list: GitHub API responses, in job order
+    """
+    async def run():
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with api_client.make_async_client() as client:
+            return await asyncio.gather(
+                *[_asubmit_review(client, semaphore, job) for job in jobs]
+            )
+
+    return asyncio.run(run())
+
+
+def submit_review(pr_number, repo, comments, event='COMMENT', body=None, commit_sha=None):
+    """
+    Submit a pull request review with multiple inline comments.
+
+    Args:
+        pr_number: PR number
+        repo: Repository in format owner/repo
+        comments: List of comment objects with {path, line, body, start_line (optional)}
+        event: Review event type (APPROVE, REQUEST_CHANGES, COMMENT)
+        body: Optional overall review summary
+        commit_sha: Optional commit SHA (defaults to PR head)
+
+    Returns:
+        dict: Response from GitHub API
+    """
+    # Get commit SHA if not provided
+    if not commit_sha:
+        commit_sha = _head_sha(repo, pr_number)
+
+    # Build API request
+    api_path = f"/repos/{repo}/pulls/{pr_number}/reviews"
+    payload = _build_payload(comments, event, body, commit_sha)
+
+    # Execute API call
     try:
-        result = subprocess.run(
-            cmd,
-            input=payload_json,
-            capture_output=True,
-            text=True,
-            check=True
+        response = _post_with_retry(api_client.get_client(), api_path, payload)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        print(
+            f"Error submitting review: {e.response.status_code} {e.response.text}",
+            file=sys.stderr
         )
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error submitting review: {e.stderr}", file=sys.stderr)
-        print(f"Payload: {payload_json}", file=sys.stderr)
+        print(f"Payload: {json.dumps(payload)}", file=sys.stderr)
+        sys.exit(1)
+    except httpx.HTTPError as e:
+        print(f"Error submitting review: {e}", file=sys.stderr)
         sys.exit(1)
 
 
@@ -97,13 +267,18 @@ def main():
     parser = argparse.ArgumentParser(
         description='Submit a complete pull request review with multiple inline comments'
     )
-    parser.add_argument('pr_number', help='PR number')
-    parser.add_argument('--repo', required=True, help='Repository in format owner/repo')
+    parser.add_argument('pr_number', nargs='?', help='PR number')
+    parser.add_argument('--repo', help='Repository in format owner/repo')
     parser.add_argument(
         '--comments-file',
-        required=True,
         help='JSON file containing array of comments [{path, line, body, start_line?}, ...]'
     )
+    parser.add_argument(
+        '--batch-file',
+        help='JSON file containing array of review jobs '
+             '[{pr_number, repo, comments, event?, body?, commit_sha?}, ...] '
+             'submitted concurrently'
+    )
     parser.add_argument(
         '--event',
         choices=['APPROVE', 'REQUEST_CHANGES', 'COMMENT'],
@@ -115,27 +290,64 @@ def main():
 
     args = parser.parse_args()
 
+    if args.batch_file:
+        try:
+            jobs = _load_json_file(args.batch_file)
+        except FileNotFoundError:
+            print(f"Error: Batch file not found: {args.batch_file}", file=sys.stderr)
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: Invalid JSON in batch file: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            results = submit_reviews_batch(jobs)
+        except httpx.HTTPError as e:
+            print(f"Error submitting reviews: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        api_client.print_json(results)
+        print(f"\n✅ Submitted {len(results)} reviews", file=sys.stderr)
+        return
+
+    if not (args.pr_number and args.repo and args.comments_file):
+        parser.error('pr_number, --repo and --comments-file are required unless --batch-file is used')
+
     # Load comments from file
     try:
-        with open(args.comments_file, 'r') as f:
-            comments = json.load(f)
+        comments = _load_json_file(args.comments_file)
     except FileNotFoundError:
         print(f"Error: Comments file not found: {args.comments_file}", file=sys.stderr)
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"Error: Invalid JSON in comments file: {e}", file=sys.stderr)
         sys.exit(1)
 
-    result = submit_review(
-        args.pr_number,
-        args.repo,
-        comments,
-        args.event,
-        args.body,
-        args.commit_sha
-    )
+    # Use the persistent agent when one is running, otherwise work in-process
+    try:
+        import gh_agent
+        result = gh_agent.call('submit_review', {
+            'pr_number': args.pr_number,
+            'repo': args.repo,
+            'comments': comments,
+            'event': args.event,
+            'body': args.body,
+            'commit_sha': args.commit_sha,
+        })
+    except (ImportError, OSError):
+        result = submit_review(
+            args.pr_number,
+            args.repo,
+            comments,
+            args.event,
+            args.body,
+            args.commit_sha
+        )
+    except gh_agent.AgentError as e:
+        print(f"Error submitting review: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    print(json.dumps(result, indent=2))
+    api_client.print_json(result)
     print(f"\n✅ Review submitted successfully with {len(comments)} comments", file=sys.stderr)
 
 